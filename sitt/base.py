@@ -13,7 +13,9 @@ from __future__ import annotations
 import abc
 import datetime as dt
 import logging
+import multiprocessing as mp
 from enum import Enum
+from multiprocessing.sharedctypes import Synchronized
 from typing import Dict, List
 
 import geopandas as gpd
@@ -43,6 +45,8 @@ __all__ = [
 ########################################################################################################################
 
 id_counter = 0
+shared_id_counter: Synchronized | None = None
+"""process-shared counter, used instead of id_counter if agents are simulated in several processes"""
 
 
 def generate_nanoid() -> str:
@@ -53,10 +57,50 @@ def generate_id() -> str:
     """This utility function will generate uids for agents in increasing numerical order, padded with leading zeros."""
     global id_counter
 
+    if shared_id_counter is not None:
+        with shared_id_counter.get_lock():
+            shared_id_counter.value += 1
+            return str(shared_id_counter.value).zfill(6)
+
     id_counter += 1
     return str(id_counter).zfill(6)
 
 
+def create_shared_id_counter(mp_context=None) -> Synchronized:
+    """
+    Create a process-shared id counter starting at the current uid and use it in this process.
+
+    :param mp_context: multiprocessing context the worker processes are started with (default: default context)
+    """
+    counter = (mp_context or mp.get_context()).Value('q', id_counter)
+    use_shared_id_counter(counter)
+    return counter
+
+
+def use_shared_id_counter(counter: Synchronized | None):
+    """
+    Draw uids from a process-shared counter - pass None to switch back to the local counter (continuing at the value of
+    the shared counter).
+    """
+    global id_counter, shared_id_counter
+
+    if counter is None and shared_id_counter is not None:
+        id_counter = shared_id_counter.value
+    shared_id_counter = counter
+
+
+def get_agents_data(entity: ig.Vertex | ig.Edge) -> dict:
+    """
+    Get agents data of a vertex or edge in route data, creating it if it does not exist yet. Does not call
+    attribute_names(), which creates a new list on each call.
+    """
+    try:
+        return entity['agents']
+    except KeyError:
+        agents = entity['agents'] = {}
+        return agents
+
+
 ########################################################################################################################
 # Configuration
 ########################################################################################################################
@@ -118,6 +162,13 @@ class Configuration:
 
         self.break_simulation_after: int = 100
         """Break single simulation entity after not advancing for this many steps"""
+        self.simulation_workers: int = 1
+        """Number of processes to run agent steps in (1 or less runs all steps in the main process)"""
+        self.simulation_min_agents_per_worker: int = 20
+        """
+        Minimum number of agents per worker process to run a step in parallel - agents are pickled to and from the
+        workers on each step, which costs more than the step itself for few agents
+        """
 
         # define logging
         logging.basicConfig(format='%(asctime)s %(message)s')
@@ -148,6 +199,12 @@ class Configuration:
 
         return state
 
+    def __setstate__(self, state):
+        # restore skip_step converted in __getstate__, so pickled configurations can be run (e.g. in worker processes)
+        state = state.copy()
+        state['skip_step'] = SkipStep(state['skip_step']) if 'skip_step' in state else SkipStep.NONE
+        self.__dict__.update(state)
+
 
 ########################################################################################################################
 # Context
@@ -292,19 +349,77 @@ class Context(object):
         paths in preparation.create_routes).
         """
         self.space_time_data: Dict[str, SpaceTimeData] = {}
+        self._name_indexes: Dict[str, tuple[ig.Graph, int, Dict[str, int]]] = {}
+        """cached name -> index maps of graphs, rebuilt if a graph is replaced or changed"""
 
     def get_path_by_id(self, path_id: str) -> ig.Edge | None:
         """Get path by id"""
         if self.graph:
-            return self.routes.es.find(name=path_id)
+            return self.routes.es[self._get_index('routes_es', self.routes, path_id, True)]
         return None
 
     def get_hub_by_id(self, hub_id) -> ig.Vertex | None:
         """Get hub by id"""
         if self.graph:
-            return self.routes.vs.find(name=hub_id)
+            return self.routes.vs[self._get_index('routes_vs', self.routes, hub_id, False)]
         return None
 
+    def get_graph_hub_by_id(self, hub_id: str) -> ig.Vertex | None:
+        """Get hub by id from the full graph"""
+        if self.graph:
+            return self.graph.vs[self._get_index('graph_vs', self.graph, hub_id, False)]
+        return None
+
+    def get_graph_path_by_id(self, path_id: str) -> ig.Edge | None:
+        """Get path by id from the full graph"""
+        if self.graph:
+            return self.graph.es[self._get_index('graph_es', self.graph, path_id, True)]
+        return None
+
+    def _get_index(self, key: str, g: ig.Graph, name: str, edges: bool) -> int:
+        """
+        Get index of a vertex or edge by name. Names are mapped once per graph - es.find() scans all edges on each call.
+        The maps are rebuilt if a graph is replaced or its number of vertices or edges changes. If a name is not found
+        or the element found has a different name (graph changed in place), the map is rebuilt, too.
+
+        :param key: cache key
+        :param g: graph to look up
+        :param name: name of vertex or edge
+        :param edges: look up edges instead of vertices
+        :return: index of first vertex or edge with this name
+        """
+        seq = g.es if edges else g.vs
+        count = len(seq)
+        cached = self._name_indexes.get(key)
+        rebuilt = cached is None or cached[0] is not g or cached[1] != count
+        if rebuilt:
+            cached = self._name_indexes[key] = self._build_index(g, seq)
+
+        i = cached[2].get(name)
+        if not rebuilt and (i is None or seq[i]['name'] != name):
+            # map might be stale, because names have been changed in place - map again
+            cached = self._name_indexes[key] = self._build_index(g, seq)
+            i = cached[2].get(name)
+
+        if i is None:
+            raise ValueError('no such edge' if edges else 'no such vertex')
+        return i
+
+    @staticmethod
+    def _build_index(g: ig.Graph, seq: ig.VertexSeq | ig.EdgeSeq) -> tuple[ig.Graph, int, Dict[str, int]]:
+        """
+        Map names of vertices or edges to their indexes (first one for duplicate names).
+
+        :param g: graph
+        :param seq: vertex or edge sequence of graph
+        :return: tuple of graph, number of vertices or edges, and map
+        """
+        index: Dict[str, int] = {}
+        if 'name' in seq.attribute_names():
+            for i, n in enumerate(seq['name']):
+                index.setdefault(n, i)
+        return g, len(seq), index
+
 
 ########################################################################################################################
 # Agent and State
@@ -313,6 +428,9 @@ class Context(object):
 class State(object):
     """State class - this will take information on the current state of a simulation agent, it will be reset each day"""
 
+    __slots__ = ('uid', 'time_taken', 'time_for_legs', 'data_for_legs', 'signal_stop_here')
+    """fixed attributes - there are many states during a simulation, so keep them small and quick to access"""
+
     def __init__(self):
         self.uid: str = generate_nanoid()
         """unique id"""
@@ -335,6 +453,20 @@ class State(object):
 
         return self
 
+    def clone(self) -> State:
+        """
+        Copy state, quicker than copy.deepcopy. Leg lists are copied shallowly, simulation steps replace them instead
+        of changing their entries.
+        """
+        state = State.__new__(State)
+        state.uid = self.uid
+        state.time_taken = self.time_taken
+        state.time_for_legs = self.time_for_legs.copy()
+        state.data_for_legs = self.data_for_legs.copy()
+        state.signal_stop_here = self.signal_stop_here
+
+        return state
+
     def __repr__(self) -> str:
         return f'State {self.uid} TT={self.time_taken:.2f} STOP_HERE={self.signal_stop_here}'
 
@@ -347,6 +479,12 @@ class State(object):
 class Agent(object):
     """Agent - simulating single travelling entity at a specific time and date"""
 
+    __slots__ = ('uid', 'state', 'this_hub', 'next_hub', 'route_key', 'last_route', 'current_day', 'current_time',
+                 'max_time', 'day_finished', 'day_cancelled', 'tries', 'last_resting_place', 'route_data',
+                 'visited_hubs', 'last_possible_resting_place', 'last_possible_resting_time',
+                 'hubs_since_last_possible_resting_place')
+    """fixed attributes - there are many agents during a simulation, so keep them small and quick to access"""
+
     def __init__(self, this_hub: str, next_hub: str, route_key: str, state: State | None = None,
                  current_time: float = 0., max_time: float = 0.):
         self.uid: str = generate_id()
@@ -385,10 +523,14 @@ class Agent(object):
 
         self.route_data: ig.Graph = ig.Graph(directed=True)
         """keeps route taken (multidigrapjh)"""
+        self.visited_hubs: set[str] = set()
+        """names of hubs in route_data, kept in sync with the graph for quick lookups"""
         self.last_possible_resting_place: str = this_hub
         """keeps last possible resting place"""
         self.last_possible_resting_time: float = current_time
         """keeps timestamp of last resting place"""
+        self.hubs_since_last_possible_resting_place: List[str] = []
+        """hubs passed since last possible resting place, these are removed from route_data on traceback"""
 
     def prepare_for_new_day(self, current_day: int = 1, current_time: float = 8., max_time: float = 16.):
         """
@@ -405,20 +547,19 @@ class Agent(object):
         self.max_time = max_time
         self.last_possible_resting_place = self.this_hub
         self.last_possible_resting_time = self.current_time
+        self.hubs_since_last_possible_resting_place = []
         self.state = self.state.reset()
 
         # add overnight stays
         if len(self.route_data.vs):
             vertex = self.route_data.vs.find(self.this_hub)
-
-            if 'agents' not in vertex.attribute_names():
-                vertex['agents'] = {}
+            vertex_agents = get_agents_data(vertex)
 
             for edge in vertex.in_edges():
                 for uid in edge['agents']:
                     ag = edge['agents'][uid]
 
-                    vertex['agents'][uid] = {
+                    vertex_agents[uid] = {
                         "start": {
                             "day": ag['end']['day'],
                             "time": ag['end']['time'],
@@ -439,9 +580,31 @@ class Agent(object):
     def __eq__(self, other) -> bool:
         return self.this_hub == other.this_hub and self.next_hub == other.next_hub and self.route_key == other.route_key
 
-    def hash(self) -> str:
-        return self.this_hub + self.next_hub + str(self.route_key) + "_" + str(self.current_day) + "_" + str(
-            self.current_time)
+    def hash(self) -> tuple[str, str, str, int, float]:
+        """Return key of this agent's position in time and space - agents with equal keys can be merged"""
+        return self.this_hub, self.next_hub, self.route_key, self.current_day, self.current_time
+
+    def clone(self) -> Agent:
+        """
+        Copy agent, keeping its uid. This is much quicker than copy.deepcopy, because only the mutable parts are copied:
+        route data graph, state, visited hubs and hubs since last possible resting place. The agents dicts of hubs and
+        routes get new entries in place, so these are copied, too - their entries are never changed, so they are shared.
+        """
+        agent = Agent.__new__(Agent)
+        for attr in Agent.__slots__:
+            setattr(agent, attr, getattr(self, attr))
+
+        agent.state = self.state.clone()
+        agent.route_data = self.route_data.copy()
+        for seq in (agent.route_data.vs, agent.route_data.es):
+            try:
+                seq['agents'] = [None if data is None else data.copy() for data in seq['agents']]
+            except KeyError:
+                pass
+        agent.visited_hubs = self.visited_hubs.copy()
+        agent.hubs_since_last_possible_resting_place = self.hubs_since_last_possible_resting_place.copy()
+
+        return agent
 
     def generate_uid(self) -> str:
         """generate an unique id of agent"""
@@ -449,6 +612,7 @@ class Agent(object):
         return self.uid
 
     def add_first_route_data_entry(self):
+        self.visited_hubs.add(self.this_hub)
         self.route_data.add_vertex(name=self.this_hub, agents={self.uid: {
             'start': {
                 'day': self.current_day,
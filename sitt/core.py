@@ -13,13 +13,15 @@ import copy
 import logging
 import math
 import os.path
-from typing import Dict, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List
 
 import geopandas as gpd
 import igraph as ig
 import pandas as pd
 
 from sitt import Configuration, Context, SkipStep, SetOfResults, Agent
+from sitt.base import create_shared_id_counter, get_agents_data, use_shared_id_counter
 
 __all__ = ['BaseClass', 'Core', 'Preparation', 'Simulation', 'Output']
 
@@ -66,6 +68,26 @@ class Core:
 
         return None
 
+    @staticmethod
+    def run_ensemble(configs: List[Configuration], max_workers: int | None = None) -> List[List[any] | None]:
+        """
+        Run a number of independent simulations (e.g. a parameter sweep) in worker processes. Each configuration is run
+        by its own core including preparation and output, so configurations and outputs must be picklable.
+
+        :param configs: list of configuration objects
+        :param max_workers: maximum number of worker processes (default: number of processors)
+        :return: list of outputs (or None if output is skipped) in the order of the configurations
+        """
+        logger.info("Running %d simulations in worker processes.", len(configs))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(_run_core, configs))
+
+
+def _run_core(config: Configuration) -> List[any] | None:
+    """Run a single core in a worker process, see Core.run_ensemble"""
+    return Core(config).run()
+
 
 ########################################################################################################################
 # Abstract base class for Preparation, Simulation, and Output.
@@ -84,21 +106,23 @@ class BaseClass(abc.ABC):
     def is_skipped(self, module: object, context: Context) -> bool:
         """check for skip"""
         if hasattr(module, 'skip') and module.skip:
-            logger.info("Skipping %s due to setting" % module)
+            logger.info("Skipping %s due to setting", module)
             return True
 
-        if hasattr(module, 'conditions') and module.conditions and len(module.conditions) > 0:
-            for condition in module.conditions:
+        conditions = getattr(module, 'conditions', None)
+        if conditions:
+            for condition in conditions:
+                # conditions prefixed by "not_" are negated
                 condition_key = condition
                 prerequisite = False
                 if condition.startswith('not_'):
                     condition_key = condition[4:]
                     prerequisite = True
 
-                mydata = module.conditions[condition]
+                mydata = conditions[condition]
 
                 if self.condition_ok(condition_key, condition, mydata, module, context=context) == prerequisite:
-                    logger.info("Skipping %s due to unmet condition: %s = %s" % (module, condition, mydata))
+                    logger.info("Skipping %s due to unmet condition: %s = %s", module, condition, mydata)
                     return True
 
         return False
@@ -117,14 +141,14 @@ class BaseClass(abc.ABC):
                         if type(attr) == gpd.GeoDataFrame or type(attr) == pd.DataFrame:
                             return attr.size > 0
                         return attr is not None
-            logger.warning("%s not in %s not valid: %s = %s" % (condition, module, condition, data))
+            logger.warning("%s not in %s not valid: %s = %s", condition, module, condition, data)
         elif key == 'is_true':
             return data is True
         elif key == 'is_false':
             return data is False
         else:
             # Show warning if unknown condition
-            logger.warning("Unknown condition in %s: %s = %s" % (module, condition, data))
+            logger.warning("Unknown condition in %s: %s = %s", module, condition, data)
 
         return True
 
@@ -192,6 +216,21 @@ class Simulation(BaseClass):
 
         self.current_day: int = 1
         """Current day of simulation"""
+        self.pool: ProcessPoolExecutor | None = None
+        """Process pool to run agent steps in, if config.simulation_workers is greater than 1"""
+        self.outgoing_routes: Dict[str, List[tuple[str, str]]] = {}
+        """cache of outgoing routes per hub name, each a tuple of target hub and route key (filled on demand)"""
+        self.overnight_stays: Dict[str, bool] = {}
+        """cache of hub names to whether agents can stay overnight there (filled on demand)"""
+
+        # resolve hook methods once, so the loops do not have to look them up for each agent and step
+        self.prepare_day_hooks: List[Callable] = [m.prepare_for_new_day for m in config.simulation_prepare_day]
+        """bound prepare_for_new_day methods of config.simulation_prepare_day"""
+        self.define_state_hooks: List[Callable] = [m.define_state for m in config.simulation_define_state]
+        """bound define_state methods of config.simulation_define_state"""
+        self.step_hooks: List[tuple[Callable, Callable]] = [(m.check_conditions, m.update_state) for m in
+                                                            config.simulation_step]
+        """bound check_conditions and update_state methods of config.simulation_step"""
 
     def check(self) -> bool:
         """check settings"""
@@ -208,9 +247,8 @@ class Simulation(BaseClass):
             logger.error("routes is empty - simulation failed!")
             ok = False
 
-        if logger.level <= logging.INFO:
-            logger.info("start:  " + self.config.simulation_start)
-            logger.info("end:    " + self.config.simulation_end)
+        logger.info("start:  %s", self.config.simulation_start)
+        logger.info("end:    %s", self.config.simulation_end)
 
         return ok
 
@@ -232,25 +270,25 @@ class Simulation(BaseClass):
         if agent_to_clone is None:
             agent_to_clone = Agent(hub, '', '', current_time=current_time, max_time=max_time)
 
-        # create new agent for each outbound edge
-        for edge in self.context.routes.incident(hub):
-            e = self.context.routes.es[edge]
-            target = e.target_vertex['name']
+        # bind to locals, these are used for each outbound edge
+        visited_hubs = agent_to_clone.visited_hubs
+        clone = agent_to_clone.clone
 
+        # create new agent for each outbound edge
+        for target, route_key in self.get_outgoing_routes(hub):
             # Does the target exist in our route data? If yes, skip, we will not visit the same place twice!
-            try:
-                agent_to_clone.route_data.vs.find(name=target)
-                if logger.level <= logging.DEBUG:
-                    logger.debug(f"Skipping {agent_to_clone} on {target}, already visited!")
+            if target in visited_hubs:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Skipping %s on %s, already visited!", agent_to_clone, target)
                 continue
-            except:
-                # create new agent for each option
-                new_agent = copy.deepcopy(agent_to_clone)
-                new_agent.this_hub = hub
-                new_agent.next_hub = target
-                new_agent.route_key = e['name']  # name of edge
 
-                agents.append(new_agent)
+            # create new agent for each option
+            new_agent = clone()
+            new_agent.this_hub = hub
+            new_agent.next_hub = target
+            new_agent.route_key = route_key  # name of edge
+
+            agents.append(new_agent)
 
         # create new uids, if agents have split
         if len(agents) > 1:
@@ -265,6 +303,38 @@ class Simulation(BaseClass):
 
         return agents
 
+    def get_outgoing_routes(self, hub: str) -> List[tuple[str, str]]:
+        """
+        Get outgoing routes of a hub - these are looked up in the routes graph once and cached afterward.
+
+        :param hub: hub name
+        :return: list of tuples (target hub name, route key)
+        """
+        routes = self.outgoing_routes.get(hub)
+        if routes is None:
+            edges = self.context.routes.es[self.context.routes.incident(hub)]
+            routes = [(e.target_vertex['name'], e['name']) for e in edges]
+            self.outgoing_routes[hub] = routes
+
+        return routes
+
+    def is_overnight_stay(self, hub: str) -> bool:
+        """
+        Check whether agents can stay overnight at a hub - these are hubs marked as overnight or having an overnight
+        hub. Looked up in the graph once per hub and cached afterward.
+
+        :param hub: hub name
+        :return: true if agents can stay overnight
+        """
+        overnight = self.overnight_stays.get(hub)
+        if overnight is None:
+            vertex = self.context.get_graph_hub_by_id(hub)
+            overnight = vertex['overnight'] == 'y' or (
+                    'overnight_hub' in self.context.graph.vs.attribute_names() and bool(vertex['overnight_hub']))
+            self.overnight_stays[hub] = overnight
+
+        return overnight
+
     def _prune_agent_list(self, agent_list: List[Agent]) -> List[Agent]:
         """
         Prune the agent list to reduce the number of agents in a list to include only unique ones.
@@ -272,39 +342,42 @@ class Simulation(BaseClass):
         :param agent_list: old agent list
         :return: new agent list
         """
-        hashed_agents: Dict[str, Agent] = {}
+        hashed_agents: Dict[tuple[str, str, str, int, float], Agent] = {}
 
         for agent in agent_list:
-            hash_id = agent.hash()
-            if hash_id not in hashed_agents:
-                hashed_agents[hash_id] = agent
-            else:
+            # single dict lookup: first agent with this hash is kept, others are merged into it
+            merged_agent = hashed_agents.setdefault(agent.hash(), agent)
+            if merged_agent is not agent:
                 # merge graphs - we want to have all possible graphs at the end
 
-                # we start with copying/merging hub data
-                for hub in agent.route_data.vs:
-                    if 'agents' in hub.attribute_names():
-                        try:
-                            data = hashed_agents[hash_id].route_data.vs.find(name=hub['name'])
-                            if 'agents' not in data.attribute_names():
-                                data['agents'] = {}
+                # we start with copying/merging hub data - attributes are graph-wide, so check them once
+                if 'agents' in agent.route_data.vs.attribute_names():
+                    for hub in agent.route_data.vs:
+                        if hub['name'] in merged_agent.visited_hubs:
+                            data = get_agents_data(merged_agent.route_data.vs.find(name=hub['name']))
                             for uid in hub['agents']:
-                                if uid not in data['agents']:
-                                    data['agents'][uid] = hub['agents'][uid]
-                        except:
-                            hashed_agents[hash_id].route_data.add_vertices(1, attributes=hub.attributes())
+                                if uid not in data:
+                                    data[uid] = hub['agents'][uid]
+                        else:
+                            merged_agent.route_data.add_vertices(1, attributes=hub.attributes())
+                merged_agent.visited_hubs |= agent.visited_hubs
+
+                # now connect edges - map keys of merged edges to their indexes once, es.find() scans all edges
+                edge_indexes: Dict[str, int] = {}
+                if merged_agent.route_data.ecount():
+                    for i, key in enumerate(merged_agent.route_data.es['key']):
+                        edge_indexes.setdefault(key, i)
 
-                # now connect edges
                 for edge in agent.route_data.es:
-                    try:
-                        data = hashed_agents[hash_id].route_data.es.find(key=edge['key'])
-                        if 'agents' not in data.attribute_names():
-                            data['agents'] = {}
+                    i = edge_indexes.get(edge['key'])
+                    if i is not None:
+                        data = get_agents_data(merged_agent.route_data.es[i])
                         for uid in edge['agents']:
-                            if uid not in data['agents']:
-                                data['agents'][uid] = edge['agents'][uid]
-                    except:
-                        hashed_agents[hash_id].route_data.add_edge(edge.source_vertex['name'], edge.target_vertex['name'], agents=edge['agents'], key=edge['key'])
+                            if uid not in data:
+                                data[uid] = edge['agents'][uid]
+                    else:
+                        edge_indexes[edge['key']] = merged_agent.route_data.ecount()
+                        merged_agent.route_data.add_edge(edge.source_vertex['name'], edge.target_vertex['name'], agents=edge['agents'], key=edge['key'])
 
         return list(hashed_agents.values())
 
@@ -327,10 +400,17 @@ class Simulation(BaseClass):
         # reset day counter
         self.current_day = 1
 
+        # start worker processes, if we want to run steps in parallel
+        if self.config.simulation_workers > 1:
+            self._start_pool()
+
         # do the loop - this is the outer loop for the whole simulation
         # it will run until there are no agents left
-        while len(agents):
-            agents = self._run_single_day(agents, results)
+        try:
+            while len(agents):
+                agents = self._run_single_day(agents, results)
+        finally:
+            self._stop_pool()
 
         # end simulation - do some history and statistics
         self._end_simulation(results)
@@ -354,25 +434,34 @@ class Simulation(BaseClass):
         for agent in agents:
             agent.prepare_for_new_day(current_day=self.current_day)
             # run SimulationPrepareDayInterfaces
-            for prep_day in self.config.simulation_prepare_day:
-                prep_day.prepare_for_new_day(self.config, self.context, agent)
+            for prepare_for_new_day in self.prepare_day_hooks:
+                prepare_for_new_day(self.config, self.context, agent)
 
         # Prune list, because we might have agents that start on the same position now
         agents = self._prune_agent_list(agents)
 
-        if logger.level <= logging.INFO:
-            logger.info("Running day " + str(self.current_day) + " with " + str(len(agents)) + " active agent(s).")
+        logger.info("Running day %d with %d active agent(s).", self.current_day, len(agents))
+
+        agents_proceed: List[Agent] = []
+        """keeps list of agents that proceed today - swapped with agents after each step, so lists are reused"""
+
+        # bind to locals, these are used for each agent and step
+        run_single_step = self._run_single_step
+        pool = self.pool
+        # agents are pickled to and from the workers on each step, so only use them for larger numbers of agents
+        min_agents_for_pool = self.config.simulation_workers * max(1, self.config.simulation_min_agents_per_worker)
 
         # do single day loop - this is the inner loop for the simulation (per day)
         while len(agents):
-            agents_proceed: List[Agent] = []
-            """keeps list of agents that proceed today"""
-
-            # do single step for each agent
-            for agent in agents:
-                self._run_single_step(agent, results, agents_proceed, agents_finished_for_today)
+            # do single step for each agent - in worker processes, if there are enough agents to split among them
+            if pool is not None and len(agents) >= min_agents_for_pool:
+                self._run_steps_in_pool(agents, results, agents_proceed, agents_finished_for_today)
+            else:
+                for agent in agents:
+                    run_single_step(agent, results, agents_proceed, agents_finished_for_today)
 
-            agents = agents_proceed
+            agents, agents_proceed = agents_proceed, agents
+            agents_proceed.clear()
 
         # increase day
         self.current_day += 1
@@ -393,36 +482,35 @@ class Simulation(BaseClass):
         # calculate state of agent at this node
         agent.state.reset()  # reset first
         # and module calls
-        for def_state in self.config.simulation_define_state:
-            agent.state = def_state.define_state(self.config, self.context, agent)
+        for define_state in self.define_state_hooks:
+            agent.state = define_state(self.config, self.context, agent)
 
         # get the next leg from context
         last_key = agent.route_key
         next_leg: ig.Edge = self.context.get_path_by_id(last_key)
 
         # run the actual state update loop
-        for sim_step in self.config.simulation_step:
+        is_reversed: bool | None = None
+        for check_conditions, update_state in self.step_hooks:
             # conditions are met?
-            if sim_step.check_conditions(self.config, self.context, agent, next_leg):
-                # traverse in reversed order?
-                is_reversed = False
-                if agent.this_hub != next_leg['from']:
-                    is_reversed = True
-                    if agent.next_hub != next_leg['from']:
-                        print("error!")
+            if check_conditions(self.config, self.context, agent, next_leg):
+                # traverse in reversed order? - leg is the same for all modules, so check it once
+                if is_reversed is None:
+                    is_reversed = agent.this_hub != next_leg['from']
+                    if is_reversed and agent.next_hub != next_leg['from']:
+                        logger.error("Leg %s does not connect %s and %s (agent %s)", last_key, agent.this_hub,
+                                     agent.next_hub, agent.uid)
 
                 # run state update
-                agent.state = sim_step.update_state(self.config, self.context, agent, next_leg, is_reversed)
+                agent.state = update_state(self.config, self.context, agent, next_leg, is_reversed)
 
         # proceed or stop here?
         if not agent.state.signal_stop_here and agent.state.time_taken >= 0 and agent.current_time + agent.state.time_taken <= agent.max_time:
             # add hub history
-            hub = agent.route_data.vs.find(name=agent.this_hub)
-            if 'agents' not in hub.attribute_names():
-                hub['agents'] = {}
+            hub_agents = get_agents_data(agent.route_data.vs.find(name=agent.this_hub))
             # add stop-over if not added already
-            if agent.uid not in hub['agents']:
-                hub['agents'][agent.uid] = {
+            if agent.uid not in hub_agents:
+                hub_agents[agent.uid] = {
                     'start': {
                         'day': agent.current_day,
                         'time': agent.current_time,
@@ -439,9 +527,8 @@ class Simulation(BaseClass):
             agent.last_route = last_key
 
             # add next vertex, if needed
-            try:
-                agent.route_data.vs.find(name=agent.next_hub)
-            except:
+            if agent.next_hub not in agent.visited_hubs:
+                agent.visited_hubs.add(agent.next_hub)
                 agent.route_data.add_vertex(name=agent.next_hub, agents={})
             # add route data
             attrs = {'key': agent.route_key,
@@ -459,23 +546,17 @@ class Simulation(BaseClass):
             agent.route_data.add_edge(agent.this_hub, agent.next_hub, **attrs)
 
             # finished?
-            next_hub = self.context.graph.vs.find(name=agent.next_hub)
-            has_overnight_hub = 'overnight_hub' in next_hub.attribute_names()
-
             if agent.next_hub == self.config.simulation_end:
                 agent.this_hub = self.config.simulation_end
                 agent.next_hub = ''
                 agent.route_key = ''
                 agent.day_finished = self.current_day
                 results.agents_finished.append(agent)
-            elif next_hub['overnight'] == 'y' or (has_overnight_hub and next_hub['overnight_hub']):
+            elif self.is_overnight_stay(agent.next_hub):
                 # proceed to new hub -> it is an overnight stay
-                if has_overnight_hub and next_hub['overnight_hub'] and agent.next_hub != next_hub['overnight_hub']:
-                    agent.last_possible_resting_place = agent.next_hub
-                    agent.last_possible_resting_time = agent.current_time
-                else:
-                    agent.last_possible_resting_place = agent.next_hub
-                    agent.last_possible_resting_time = agent.current_time
+                agent.last_possible_resting_place = agent.next_hub
+                agent.last_possible_resting_time = agent.current_time
+                agent.hubs_since_last_possible_resting_place = []
 
                 next_hub_agents = self.create_agents_on_node(agent.next_hub, agent)
 
@@ -485,17 +566,63 @@ class Simulation(BaseClass):
                     agents_proceed.extend(next_hub_agents)
             else:
                 # proceed, but this is not an overnight stay
-                if agent.state.signal_stop_here or agent.current_time == agent.max_time:
+                if agent.current_time == agent.max_time:
                     # very special case that should not occur often: we arrive at the node exactly on maximum
                     # time, end day - this will increase test timer
                     self._end_day(agent, results, agents_finished_for_today)
                 else:
                     # normal case just proceed
+                    agent.hubs_since_last_possible_resting_place.append(agent.next_hub)
                     agents_proceed.extend(self.create_agents_on_node(agent.next_hub, agent))
         else:
             # time exceeded, end day
             self._end_day(agent, results, agents_finished_for_today)
 
+    def _start_pool(self, mp_context=None):
+        """
+        Start worker processes - each will keep its own copy of config and context. Preparation and output modules are
+        not needed to run steps and might not be picklable (e.g. database connections), so they are not sent.
+
+        :param mp_context: multiprocessing context to start workers with (default: platform's default start method)
+        """
+        worker_config = copy.copy(self.config)
+        worker_config.preparation = []
+        worker_config.output = []
+
+        counter = create_shared_id_counter(mp_context)
+        self.pool = ProcessPoolExecutor(max_workers=self.config.simulation_workers, mp_context=mp_context,
+                                        initializer=_init_step_worker, initargs=(worker_config, self.context, counter))
+
+        logger.info("Running agent steps in %d worker processes.", self.config.simulation_workers)
+
+    def _stop_pool(self):
+        """Shut down worker processes, if any."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+            use_shared_id_counter(None)
+
+    def _run_steps_in_pool(self, agents: List[Agent], results: SetOfResults, agents_proceed: List[Agent],
+                           agents_finished_for_today: List[Agent]):
+        """
+        Run single step for a list of agents in worker processes - agents are split into chunks, one per worker.
+        Results are merged back in chunk order, so lists are filled in the same order as in the sequential loop.
+
+        :param agents: list of agents to run steps for
+        :param results: set of results to fill into (mutated)
+        :param agents_proceed: list of agents that proceed today (mutated)
+        :param agents_finished_for_today:  list of agents that have finished for today (mutated)
+        """
+        chunk_size = math.ceil(len(agents) / self.config.simulation_workers)
+        chunks = [agents[i:i + chunk_size] for i in range(0, len(agents), chunk_size)]
+
+        for proceed, finished_for_today, finished, cancelled in self.pool.map(
+                _run_step_chunk, [self.current_day] * len(chunks), chunks):
+            agents_proceed.extend(proceed)
+            agents_finished_for_today.extend(finished_for_today)
+            results.agents_finished.extend(finished)
+            results.agents_cancelled.extend(cancelled)
+
     def _end_day(self, agent: Agent, results: SetOfResults, agents_finished_for_today: List[Agent]):
         """
         End this day for agent.
@@ -512,16 +639,14 @@ class Simulation(BaseClass):
             results.agents_cancelled.append(agent)
         else:
             # traceback to last possible resting place, if needed
-            if self.context.graph.vs.find(name=agent.this_hub)['overnight'] == 'n':
-                # compile entries to delete from graph
-                hubs_to_delete: set[int] = set()
-
-                # gather vertex ids to delete
-                for path in agent.route_data.get_all_simple_paths(agent.last_possible_resting_place, agent.this_hub):
-                    hubs_to_delete.update(path[1:])
-
-                # actually delete hubs from graph
-                agent.route_data.delete_vertices(list(hubs_to_delete))
+            if self.context.get_graph_hub_by_id(agent.this_hub)['overnight'] == 'n':
+                # delete hubs passed since the last possible resting place from graph - these have been tracked
+                # while proceeding, so we do not have to search paths back to the resting place
+                hubs_to_delete = agent.hubs_since_last_possible_resting_place
+                if hubs_to_delete:
+                    agent.visited_hubs.difference_update(hubs_to_delete)
+                    agent.route_data.delete_vertices(hubs_to_delete)
+                    agent.hubs_since_last_possible_resting_place = []
 
                 agents_finished_for_today.extend(
                     self.create_agents_on_node(agent.last_possible_resting_place, agent))
@@ -539,16 +664,9 @@ class Simulation(BaseClass):
 
         :param results: set of results
         """
-        max_day: float = 0.
-        max_time: float = 0.
-
-        # first, determine max_time and max_day
-        for agent in results.agents_finished:
-            if agent.current_day > max_day:
-                max_day = agent.current_day
-                max_time = agent.current_time
-            elif agent.current_day == max_day and agent.current_time > max_time:
-                max_time = agent.current_time
+        # first, determine max_time and max_day - latest time on the latest day
+        max_day, max_time = max(((agent.current_day, agent.current_time) for agent in results.agents_finished),
+                                default=(0, 0.))
 
         # round up max_time
         max_time = math.ceil(max_time)
@@ -569,6 +687,39 @@ class Simulation(BaseClass):
         # TODO: handle unfinished agents, too?
 
 
+_worker_simulation: Simulation | None = None
+"""simulation instance of worker process"""
+
+
+def _init_step_worker(config: Configuration, context: Context, counter):
+    """Initialize worker process - keeps read-only config and context, so they are not sent with each task."""
+    global _worker_simulation
+
+    use_shared_id_counter(counter)
+    _worker_simulation = Simulation(config, context)
+
+
+def _run_step_chunk(current_day: int, agents: List[Agent]) -> tuple[
+        List[Agent], List[Agent], List[Agent], List[Agent]]:
+    """
+    Run single step for a chunk of agents in a worker process.
+
+    :param current_day: current day of simulation
+    :param agents: agents to run step for
+    :return: tuple of agents proceeding, agents finished for today, agents finished, and agents cancelled
+    """
+    _worker_simulation.current_day = current_day
+
+    results = SetOfResults()
+    agents_proceed: List[Agent] = []
+    agents_finished_for_today: List[Agent] = []
+
+    for agent in agents:
+        _worker_simulation._run_single_step(agent, results, agents_proceed, agents_finished_for_today)
+
+    return agents_proceed, agents_finished_for_today, results.agents_finished, results.agents_cancelled
+
+
 ########################################################################################################################
 # Output class
 ########################################################################################################################
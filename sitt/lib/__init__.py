@@ -3,7 +3,7 @@
 # SPDX-License-Identifier: MIT
 """Output Modules"""
 
-from .adjacency_list import create_adjacency_list, get_shortest_path, create_shortest_path_data
+from .adjacency_list import create_adjacency_list, get_nodes_before, get_shortest_path, create_shortest_path_data
 from .compact_graph import compact_graph
 from .graph_to_shapefile import convert_graph_to_shapefile
 from .path_weeder import PathWeeder
@@ -13,6 +13,7 @@ __all__ = [
     "create_shortest_path_data",
     "compact_graph",
     "convert_graph_to_shapefile",
+    "get_nodes_before",
     "get_shortest_path",
     "PathWeeder",
 ]
@@ -3,7 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 import heapq as hq
-from sys import float_info
+from collections.abc import Iterator, Mapping
 
 import igraph as ig
 
@@ -16,95 +16,128 @@ def create_adjacency_list(g: ig.Graph, start_node_index: int, is_sorted: bool =
     """
     Create an adjacency list for a given undirected graph.
 
-    :param g: Undirected graph
+    :param g: Undirected graph (directed graphs are supported, too - only outgoing edges are considered then)
     :param start_node_index: Start node index
     :param is_sorted: If True, sort adjacent nodes distance in ascending order. Default is False.
     :return: Adjacency list for the given graph. Each entry is an index plus a list of tuples (neighbor_index, edge_index, edge_length)
     """
-    # does our model have target hubs?
-    has_target_hubs = 'target_hub' in g.es.attribute_names()
-
-    # each index will be a node index with list of tuples (neighbor_index, edge_index, edge_length)
-    adj: list[list[tuple[int, int, float]]] = [[]] * g.vcount()
-    for v in g.vs:
-        adj_list = []
-        for e in v.incident():
-            idx = e.target if e.source == v.index else e.source
-
-            # TODO: not quite correct yet
-            # # do not consider edges that have target hubs set and are the wrong direction
-            # if has_target_hubs and e['target_hub'] is not None and e['target_hub'] != '' and e['target_hub'] != v['name']:
-            #     continue
-
-            adj_list.append((idx, e.index, e['length_m']))
-        # sort by length
-        if is_sorted:
+    # fetch lengths once instead of looking them up for each edge
+    lengths: list[float] = g.es['length_m'] if g.ecount() else []
+
+    # each index will be a node index with list of tuples (neighbor_index, edge_index, edge_length) - traverse all
+    # edges once and add them to their source vertex (and to their target vertex, if the graph is undirected)
+    is_directed = g.is_directed()
+    adj: list[list[tuple[int, int, float]]] = [[] for _ in range(g.vcount())]
+    for edge_index, (source, target) in enumerate(g.get_edgelist()):
+        length = lengths[edge_index]
+        adj[source].append((target, edge_index, length))
+        if not is_directed:
+            adj[target].append((source, edge_index, length))
+
+    # sort by length
+    if is_sorted:
+        for adj_list in adj:
             adj_list.sort(key=lambda x: x[2])
-        adj[v.index] = adj_list
 
     return adj
 
 
 def create_shortest_path_data(g: ig.Graph, start_node: int | str | ig.Vertex, is_sorted: bool = False) -> tuple[
-    dict[int, float], dict[int, int | None], dict[int, set], list[list[tuple[int, int, float]]]]:
+    dict[int, float], dict[int, int | None], Mapping[int, set[int]], list[list[tuple[int, int, float]]]]:
     """
     Create the shortest path data for a given undirected graph with distances from a given start node.
 
     :param g: Undirected graph
     :param start_node: Start node index, name or vertex object
     :param is_sorted: If True, sort adjacent nodes distance in ascending order. Default is False.
-    :return: Tuple of dictionaries (distances, sources, nodes_before, adj). distances is a dictionary of node index to
-        the shortest distance from the start node to the given node. sources is a dictionary of node index to the node
-        that we reached it through. nodes_before is a dictionary of node index to the nodes that came before it. The
-        last return value is the adjacency list.
+    :return: Tuple (distances, sources, nodes_before, adj). distances is a dictionary of node index to the shortest
+        distance from the start node to the given node. sources is a dictionary of node index to its parent in the
+        shortest path tree, i.e. the node that we reached it through on its shortest path (None for the start node).
+        nodes_before is a mapping of node index to the nodes on its shortest path before it (calculated on access,
+        see get_nodes_before). The last return value is the adjacency list.
     """
     start_node_index = node_to_index(g, start_node)
 
     adj: list[list[tuple[int, int, float]]] = create_adjacency_list(g, start_node_index, is_sorted)
 
-    # run Dijkstra's Algorithm - keep list of distances and sources
+    distances, sources, _ = _run_dijkstra(adj, start_node_index)
+
+    return distances, sources, NodesBefore(sources), adj
+
+
+def _run_dijkstra(adj: list[list[tuple[int, int, float]]], start_node_index: int) -> tuple[
+    dict[int, float], dict[int, int | None], dict[int, int | None]]:
+    """
+    Run Dijkstra's Algorithm on an adjacency list.
+
+    :param adj: Adjacency list as created by create_adjacency_list
+    :param start_node_index: Start node index
+    :return: Tuple of dictionaries (distances, sources, source_edges). source_edges is a dictionary of node index to the
+        edge index we reached it through (None for the start node).
+    """
+    # keep list of distances and sources (parent pointers of the shortest path tree) and the edges to the sources
     distances = {}
     sources = {}
-    nodes_before: dict[int, set] = {start_node_index: set()}
-    heap: list[tuple[float, int]] = [(0., start_node_index)]
+    source_edges = {}
+    heap: list[tuple[float, int, int | None, int | None]] = [(0., start_node_index, None, None)]
 
     while heap:
-        dist, idx = hq.heappop(heap)
+        dist, idx, source, source_edge = hq.heappop(heap)
         if idx in distances:
             continue  # Already encountered before
 
         # We know that this is the first time we encounter node.
         #   As we pull nodes in order of increasing distance, this
-        #   must be the node's shortest distance from the start node.
+        #   must be the node's shortest distance from the start node - and we reached it through source.
         distances[idx] = dist
-
-        # we set some variables to determine the shortest neighbor to this node
-        min_dist_to_neighbors = float_info.max
-        shortest_neighbor = None
+        sources[idx] = source
+        source_edges[idx] = source_edge
 
         # Add neighbors to heap
-        for neighbor_idx, _, edge_length in adj[idx]:
-            if neighbor_idx not in nodes_before:
-                nodes_before[neighbor_idx] = set(nodes_before[idx])
-                nodes_before[neighbor_idx].add(idx)
-            else:
-                nodes_before[neighbor_idx].update(nodes_before[idx])
-                nodes_before[neighbor_idx].add(idx)
-
+        for neighbor_idx, edge_idx, edge_length in adj[idx]:
             if neighbor_idx not in distances:  # only if not encountered before
-                neighbor_distance = dist + edge_length
-                hq.heappush(heap, (neighbor_distance, neighbor_idx))
-            else:
-                neighbor_distance = distances[neighbor_idx]
+                hq.heappush(heap, (dist + edge_length, neighbor_idx, idx, edge_idx))
+
+    return distances, sources, source_edges
 
-            # update the shortest neighbor to this node
-            if neighbor_distance < min_dist_to_neighbors:
-                min_dist_to_neighbors = neighbor_distance
-                shortest_neighbor = neighbor_idx
-        # now we also now the shortest neighbor to this node, we can later check the shortest path
-        sources[idx] = shortest_neighbor
 
-    return distances, sources, nodes_before, adj
+def get_nodes_before(sources: dict[int, int | None], node_index: int) -> set[int]:
+    """
+    Get the nodes that came before a given node on its shortest path by walking back the sources. These are the
+    ancestors of the node in the shortest path tree only - nodes that are adjacent to the node (or to its ancestors),
+    but not on its shortest path, are not contained.
+
+    :param sources: sources as returned by create_shortest_path_data
+    :param node_index: node index to get the nodes before for
+    :return: set of node indexes on the shortest path from the start node to the given node (excluding the node itself)
+    """
+    nodes_before = set()
+    source = sources[node_index]
+    while source is not None:
+        nodes_before.add(source)
+        source = sources[source]
+
+    return nodes_before
+
+
+class NodesBefore(Mapping[int, set[int]]):
+    """
+    Read-only mapping of node index to the nodes on its shortest path before it - sets are created on access by
+    walking back the sources, so they do not have to be kept for each node during Dijkstra's Algorithm.
+    """
+
+    def __init__(self, sources: dict[int, int | None]):
+        self.sources: dict[int, int | None] = sources
+
+    def __getitem__(self, node_index: int) -> set[int]:
+        return get_nodes_before(self.sources, node_index)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.sources)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
 
 def get_shortest_path(g: ig.Graph, start_node: int | str | ig.Vertex, end_node: int | str | ig.Vertex) -> list[int]:
     """
@@ -113,33 +146,25 @@ def get_shortest_path(g: ig.Graph, start_node: int | str | ig.Vertex, end_node:
     :param g: Undirected graph
     :param start_node: Start node index, name or vertex object
     :param end_node: End node index, name or vertex object
-    :return: List of vertices in the shortest path from start to end.
+    :return: List of edge indexes in the shortest path from start to end.
     """
     start_node_index = node_to_index(g, start_node)
     end_node_index = node_to_index(g, end_node)
 
     # create the shortest path data and do not consider certain edges (with targets hubs, these are directed)
-    distances, sources, _, adj = create_shortest_path_data(g, start_node_index)
+    adj = create_adjacency_list(g, start_node_index)
+    distances, sources, source_edges = _run_dijkstra(adj, start_node_index)
 
     if end_node_index not in distances:
         return []  # no path from start to end
 
+    # walk back the sources - Dijkstra has kept the edges it reached each node through, which is always the shortest
+    # one of parallel edges
     path = []
     current_node = end_node_index
     while current_node != start_node_index:
-        source = sources[current_node]
-
-        shortest_edge = None
-        shortest_dist = float_info.max
-        for neighbor_idx, edge_idx, edge_length in adj[current_node]:
-            if neighbor_idx == source and edge_length < shortest_dist:
-                shortest_edge = edge_idx
-                shortest_dist = edge_length
-                # TODO: not quite correct yet
-
-        path.append(shortest_edge)
-
-        current_node = source
+        path.append(source_edges[current_node])
+        current_node = sources[current_node]
     path.reverse()
 
     return path
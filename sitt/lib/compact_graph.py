@@ -10,6 +10,7 @@ import sys
 from zlib import crc32
 
 import igraph as ig
+import numpy as np
 from pyproj import Transformer
 from shapely import LineString, Polygon, Point, centroid, intersection
 from shapely.ops import transform
@@ -21,9 +22,12 @@ def compact_graph(g: ig.Graph, transformer: Transformer) -> ig.Graph:
     # need to preserve the geometry
     # inspired by https://stackoverflow.com/questions/68499507/reduce-number-of-nodes-edges-of-a-graph-in-nedworkx
 
+    # degrees of all vertices, so we do not have to query each vertex on its own
+    degrees = np.asarray(g.degree())
+
     # create a copy of our graph - add connectors first => connectors are all nodes with more than 2 degrees
     # tg is our target graph
-    tg: ig.Graph = g.subgraph([vertex['name'] for vertex in g.vs if vertex.degree() > 2])
+    tg: ig.Graph = g.subgraph(np.flatnonzero(degrees > 2).tolist())
     # add data to edges in subgraph
     _update_edge_attributes_of_direct_neighbors(tg, transformer)
 
@@ -32,7 +36,7 @@ def compact_graph(g: ig.Graph, transformer: Transformer) -> ig.Graph:
     # if 2 => simple connectors between two shapes
     # walk chains and get endpoints for each component cluster
     for component in g.subgraph(
-            [vertex for vertex in g.vs if 0 < vertex.degree() <= 2]).connected_components().subgraphs():
+            np.flatnonzero((degrees > 0) & (degrees <= 2)).tolist()).connected_components().subgraphs():
         # Case 1: single endpoint without multiple neighbors
         if component.vcount() == 1:
             # find vertex in original graph and look for neighbors
@@ -74,6 +74,12 @@ def config_class_loader(data: dict, config: Configuration | None = None) -> Conf
     if 'break_simulation_after' in data and data['break_simulation_after']:
         config.break_simulation_after = int(data['break_simulation_after'])
 
+    # number of processes to run agent steps in
+    if 'simulation_workers' in data and data['simulation_workers']:
+        config.simulation_workers = int(data['simulation_workers'])
+    if 'simulation_min_agents_per_worker' in data and data['simulation_min_agents_per_worker']:
+        config.simulation_min_agents_per_worker = int(data['simulation_min_agents_per_worker'])
+
     # start_date
     if 'start_date' in data and data['start_date']:
         if type(data['start_date']) == dt.date:
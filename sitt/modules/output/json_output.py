@@ -122,9 +122,9 @@ class JSONOutput(OutputInterface):
         # keeps unique list of agent ids
         uids: set = {agent.uid}
 
-        # add edges to history
-        for edge in agent.route_data.es:
-            if 'agents' in edge.attribute_names():
+        # add edges to history - attributes are graph-wide, so check them once
+        if 'agents' in agent.route_data.es.attribute_names():
+            for edge in agent.route_data.es:
                 edge_key = edge['key']
                 history[edge_key] = {
                     "type": "edge",
@@ -139,8 +139,8 @@ class JSONOutput(OutputInterface):
                     uids.add(ag)
 
         # add hubs to history
-        for hub in agent.route_data.vs:
-            if 'agents' in hub.attribute_names():
+        if 'agents' in agent.route_data.vs.attribute_names():
+            for hub in agent.route_data.vs:
                 history[hub['name']] = {
                     "type": "node",
                     "id": hub['name'],
@@ -193,7 +193,7 @@ class JSONOutput(OutputInterface):
 
         # aggregate path data
         for path in self.context.routes.es:
-            orig_path = self.context.graph.es.find(name=path['name'])
+            orig_path = self.context.get_graph_path_by_id(path['name'])
             paths.append({
                 'id': path['name'],
                 "from": orig_path['from'],
@@ -65,8 +65,25 @@ class CreateRoutes(BaseClass, PreparationInterface):
         edges_considered: set[int] = set()
         tg = ig.Graph(directed=True)
 
+        # collect directed edges of all paths first, so we can add all vertices in one go
+        directed_edges: list[tuple[ig.Vertex, ig.Vertex, ig.Edge]] = []
         for p in all_paths:
-            tg = self._add_directed_graph(p[1], config.simulation_start, context.graph, tg)
+            directed_edges.extend(self._get_directed_edges(p[1], config.simulation_start, context.graph))
+
+        vertex_ids = self._add_vertices_to_graph(directed_edges, context.graph, tg)
+
+        # collect unique edges (name = unique id), so we can add all of them in one go, too
+        existing_edges: set[str] = set()
+        edge_pairs: list[tuple[int, int]] = []
+        edge_attributes: list[dict] = []
+        for source, target, edge in directed_edges:
+            name = edge['name']
+            if name not in existing_edges:
+                existing_edges.add(name)
+                edge_pairs.append((vertex_ids[source['name']], vertex_ids[target['name']]))
+                edge_attributes.append(self._get_edge_attributes(edge))
+
+        self._add_edges_to_graph(edge_pairs, edge_attributes, tg)
 
         # delete nodes with target hubs
         to_delete = []
@@ -186,20 +203,20 @@ class CreateRoutes(BaseClass, PreparationInterface):
 
         return all_paths
 
-    def _add_directed_graph(self, edges: list[int], start: str, sg: ig.Graph, tg: ig.Graph) -> ig.Graph:
+    def _get_directed_edges(self, edges: list[int], start: str, sg: ig.Graph) \
+            -> list[tuple[ig.Vertex, ig.Vertex, ig.Edge]]:
         """
-        Will add a directed graph to target graph from data of the source graph.
+        Will direct the edges of a path in the source graph, starting from the start vertex.
 
-        :param edges: edge list to add from source graph to target graph
+        :param edges: edge list of path in source graph
         :param start: start none name
         :param sg: source graph
-        :param tg: target graph
-        :return: None
+        :return: list of tuples (source vertex, target vertex, edge) in order of the path
         """
+        directed_edges: list[tuple[ig.Vertex, ig.Vertex, ig.Edge]] = []
 
-        # add start vertex, last vertex will keep last vertex to start from, so we know how to direct the edges
+        # last vertex will keep last vertex to start from, so we know how to direct the edges
         last_vertex = sg.vs.find(name=start)
-        self._add_vertex_to_graph(last_vertex.attributes(), tg)
 
         # traverse edges and check their direction
         for e in edges:
@@ -216,64 +233,72 @@ class CreateRoutes(BaseClass, PreparationInterface):
                 # this case should not happen, but just to be safe...
                 logger.fatal("PreparationInterface CreateRoutes: graph error - not consecutive vertices!")
 
-            # add vertex
-            self._add_vertex_to_graph(target.attributes(), tg)
-
-            # add edge
-            self._add_edge_to_graph(last_vertex['name'], target['name'], edge, tg)
+            directed_edges.append((last_vertex, target, edge))
 
             last_vertex = target
 
-        return tg
+        return directed_edges
 
-    def _add_vertex_to_graph(self, attributes: dict, g: ig.Graph) -> None:
+    def _add_vertices_to_graph(self, directed_edges: list[tuple[ig.Vertex, ig.Vertex, ig.Edge]], sg: ig.Graph,
+                               g: ig.Graph) -> dict[str, int]:
         """
-        Will add a vertex to a graph, if it does not exist yet (name = unique id)
+        Will add all vertices of the directed edges to a graph at once (name = unique id), in order of their first
+        appearance. Adding vertices one by one would copy igraph's attribute lists on each call.
 
-        :param attributes: vertex attributes
-        :param g: graph
-        :return: None
+        :param directed_edges: list of tuples (source vertex, target vertex, edge)
+        :param sg: source graph (vertex attributes are taken from here)
+        :param g: graph (the directed graph)
+        :return: dictionary of vertex names to their indexes in g
         """
-        try:
-            g.vs.find(name=attributes['name'])
-        except:
-            g.add_vertex(**attributes)
+        vertices: dict[str, ig.Vertex] = {}
+        for source, target, _ in directed_edges:
+            vertices.setdefault(source['name'], source)
+            vertices.setdefault(target['name'], target)
 
-    def _add_edge_to_graph(self, from_name: str, to_name: str, edge: ig.Edge, g: ig.Graph) -> None:
+        offset = g.vcount()
+        vs = sg.vs[[v.index for v in vertices.values()]]
+        g.add_vertices(len(vs), attributes={key: vs[key] for key in sg.vs.attribute_names()})
+
+        return {name: offset + i for i, name in enumerate(vertices)}
+
+    def _get_edge_attributes(self, edge: ig.Edge) -> dict:
         """
-        Will add an edge to a graph, if it does not exist yet (name = unique id)
+        Will return a cleaned copy of the edge's attributes to be added to the directed graph.
 
         :param edge: edge to copy
+        :return: attributes of edge
+        """
+        attr: dict = edge.attributes().copy()
+        # delete "none" types
+        attr = {k: v for k, v in attr.items() if v is not None}
+
+        if 'legs' in attr:
+            attr['legs'] = np.copy(attr['legs'])
+        if 'slopes' in attr:
+            attr['slopes'] = np.copy(attr['slopes'])
+        # delete "to" attribute, if it exists - we only need the "from" attribute
+        if 'to' in attr:
+            del attr['to']
+
+        return attr
+
+    def _add_edges_to_graph(self, edge_pairs: list[tuple[int, int]], edge_attributes: list[dict],
+                            g: ig.Graph) -> None:
+        """
+        Will add all edges to a graph at once. Attributes missing for an edge are set to None, like igraph does when
+        adding edges one by one.
+
+        :param edge_pairs: list of tuples (source vertex index, target vertex index) in g
+        :param edge_attributes: list of attributes, one per edge pair
         :param g: graph (the directed graph)
         :return: None
         """
-        name = edge['name']
-
-        try:
-            g.es.find(name=name)
-        except:
-            # add new edge
-            attr: dict = edge.attributes().copy()
-            # delete "none" types
-            attr = {k: v for k, v in attr.items() if v is not None}
-
-            if 'legs' in attr:
-                # clean possible empty values
-                if attr['legs'] is None:
-                    del attr['legs']
-                else:
-                    attr['legs'] = np.copy(attr['legs'])
-            if 'slopes' in attr:
-                # clean possible empty values
-                if attr['slopes'] is None:
-                    del attr['slopes']
-                else:
-                    attr['slopes'] = np.copy(attr['slopes'])
-            # delete "to" attribute, if it exists - we only need the "from" attribute
-            if 'to' in attr:
-                del attr['to']
-
-            g.add_edge(from_name, to_name, **attr)
+        # attribute names in order of their first appearance
+        keys: dict[str, None] = {}
+        for attr in edge_attributes:
+            keys.update(dict.fromkeys(attr))
+
+        g.add_edges(edge_pairs, attributes={key: [attr.get(key) for attr in edge_attributes] for key in keys})
 
     def __repr__(self):
         return yaml.dump(self)
@@ -36,7 +36,8 @@ class SimpleLoadingState(SimulationDefineStateInterface):
         if last_route_type != current_route_type:
             agent.current_time += self.add_time
 
-            if not self.skip and logger.level <= logging.DEBUG:
-                logger.debug(f"SimpleLoadingState: reloading due to route type change, new time = {agent.current_time:.2f} hours")
+            if not self.skip:
+                logger.debug("SimpleLoadingState: reloading due to route type change, new time = %.2f hours",
+                             agent.current_time)
 
         return state
\ No newline at end of file
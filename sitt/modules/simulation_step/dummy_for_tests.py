@@ -29,9 +29,9 @@ class DummyForTests(SimulationStepInterface):
 
         agent.state.time_for_legs = [agent.state.time_taken]
 
-        if not self.skip and logger.level <= logging.DEBUG:
-            logger.debug(
-                f"SimulationInterface DummyForTests run, from {agent.this_hub} to {agent.next_hub} via {agent.route_key}, time taken = {agent.state.time_taken:.2f}")
+        if not self.skip:
+            logger.debug("SimulationInterface DummyForTests run, from %s to %s via %s, time taken = %.2f", agent.this_hub,
+                         agent.next_hub, agent.route_key, agent.state.time_taken)
 
         return agent.state
 
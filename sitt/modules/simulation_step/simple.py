@@ -72,10 +72,9 @@ class Simple(SimulationStepInterface):
         state.time_taken = time_taken
         state.time_for_legs = time_for_legs
 
-        if not self.skip and logger.level <= logging.DEBUG:
-            logger.debug(
-                f"SimulationInterface Simple run, from {agent.this_hub} to {agent.next_hub} "
-                "via {agent.route_key}, time taken = {state.time_taken:.2f}")
+        if not self.skip:
+            logger.debug("SimulationInterface Simple run, from %s to %s via %s, time taken = %.2f", agent.this_hub,
+                         agent.next_hub, agent.route_key, state.time_taken)
 
         return state
 
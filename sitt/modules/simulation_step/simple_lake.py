@@ -53,9 +53,9 @@ class SimpleLake(SimulationStepInterface):
         agent.state.time_taken = time_taken
         agent.state.time_for_legs = time_for_legs
 
-        if not self.skip and logger.level <= logging.DEBUG:
-            logger.debug(
-                f"SimulationInterface SimpleLake run, from {agent.this_hub} to {agent.next_hub} via {agent.route_key}, time taken = {agent.state.time_taken:.2f}")
+        if not self.skip:
+            logger.debug("SimulationInterface SimpleLake run, from %s to %s via %s, time taken = %.2f", agent.this_hub,
+                         agent.next_hub, agent.route_key, agent.state.time_taken)
 
         return agent.state
 
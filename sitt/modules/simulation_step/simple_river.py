@@ -58,9 +58,8 @@ class SimpleRiver(SimulationStepInterface):
                 current_speed -= kph/2. # half the current's pull will be deducted from the speed, although this is not accurate
                 if current_speed < 0:
                     agent.state.signal_stop_here = True
-                    if logger.level <= logging.DEBUG:
-                        logger.debug(
-                            f"SimpleRiver against current failed: {agent.this_hub} to {agent.next_hub} via {agent.route_key}, current speed = {kph} k/h")
+                    logger.debug("SimpleRiver against current failed: %s to %s via %s, current speed = %s k/h",
+                                 agent.this_hub, agent.next_hub, agent.route_key, kph)
                     return agent.state
             else:
                 current_speed = self.speed
@@ -78,9 +77,9 @@ class SimpleRiver(SimulationStepInterface):
         agent.state.time_taken = time_taken
         agent.state.time_for_legs = time_for_legs
 
-        if not self.skip and logger.level <= logging.DEBUG:
-            logger.debug(
-                f"SimulationInterface SimpleRiver run, from {agent.this_hub} to {agent.next_hub} via {agent.route_key}, time taken = {agent.state.time_taken:.2f}")
+        if not self.skip:
+            logger.debug("SimulationInterface SimpleRiver run, from %s to %s via %s, time taken = %.2f", agent.this_hub,
+                         agent.next_hub, agent.route_key, agent.state.time_taken)
 
         return agent.state
 
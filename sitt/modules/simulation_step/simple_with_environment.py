@@ -100,21 +100,18 @@ class SimpleWithEnvironment(SimulationStepInterface):
             if 'rainfall' in space_time_data and space_time_data['rainfall'] > 0:
                 calculated_time = ((space_time_data['rainfall'] * self.rainfall_slowdown_factor) + 1) * calculated_time
 
-                if logger.level <= logging.DEBUG:
-                    logger.debug(" * Rainfall", str(space_time_data['rainfall']))
+                logger.debug(" * Rainfall %s", space_time_data['rainfall'])
 
             if 'snowfall' in space_time_data and space_time_data['snowfall'] > 0:
                 calculated_time = ((space_time_data['snowfall'] * self.snowfall_slowdown_factor) + 1) * calculated_time
 
-                if logger.level <= logging.DEBUG:
-                    logger.debug(" * Snowfall", str(space_time_data['snowfall']))
+                logger.debug(" * Snowfall %s", space_time_data['snowfall'])
 
             if 'snow_depth' in space_time_data and space_time_data['snow_depth'] > 0:
                 calculated_time = ((space_time_data[
                                         'snow_depth'] * self.snow_depth_slowdown_factor) + 1) * calculated_time
 
-                if logger.level <= logging.DEBUG:
-                    logger.debug(" * Snow height", str(space_time_data['snow_depth']))
+                logger.debug(" * Snow height %s", space_time_data['snow_depth'])
 
             time_for_legs.append(calculated_time)
             space_time_data_legs.append(space_time_data)
@@ -125,10 +122,9 @@ class SimpleWithEnvironment(SimulationStepInterface):
         state.time_for_legs = time_for_legs
         state.data_for_legs = space_time_data_legs
 
-        if not self.skip and logger.level <= logging.DEBUG:
-            logger.debug(
-                f"SimulationInterface Simple run, from {agent.this_hub} to {agent.next_hub} "
-                "via {agent.route_key}, time taken = {state.time_taken:.2f}")
+        if not self.skip:
+            logger.debug("SimulationInterface Simple run, from %s to %s via %s, time taken = %.2f", agent.this_hub,
+                         agent.next_hub, agent.route_key, state.time_taken)
 
         return state
 
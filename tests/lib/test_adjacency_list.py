@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: 2024-present Maximilian Kalus <info@auxnet.de>
+#
+# SPDX-License-Identifier: MIT
+
+import igraph as ig
+
+from sitt.lib import create_adjacency_list, create_shortest_path_data, get_nodes_before, get_shortest_path
+
+
+def _create_graph() -> ig.Graph:
+    # A-B is short, but B is only connected to C by a long edge - shortest way to C is via D
+    g = ig.Graph()
+    g.add_vertices(5, attributes={'name': ['A', 'B', 'C', 'D', 'E']})
+    g.add_edges([(0, 1), (1, 2), (0, 3), (3, 2), (2, 4), (2, 4)],
+                attributes={'length_m': [1., 100., 5., 5., 3., 2.]})
+    return g
+
+
+def test_create_shortest_path_data():
+    g = _create_graph()
+    data = create_shortest_path_data(g, 'A')
+    assert len(data) == 4
+    distances, sources, nodes_before, adj = data
+
+    assert distances == {0: 0., 1: 1., 2: 10., 3: 5., 4: 12.}
+    assert sources == {0: None, 1: 0, 2: 3, 3: 0, 4: 2}
+    assert len(adj) == 5
+    assert get_nodes_before(sources, 4) == {0, 2, 3}
+    assert get_nodes_before(sources, 0) == set()
+    # B is adjacent to C, but not on its shortest path, so it does not come before C
+    assert get_nodes_before(sources, 2) == {0, 3}
+    # nodes before are calculated on access from the sources
+    assert dict(nodes_before) == {0: set(), 1: {0}, 2: {0, 3}, 3: {0}, 4: {0, 2, 3}}
+    assert 5 not in nodes_before
+
+
+def test_get_shortest_path():
+    g = _create_graph()
+    assert get_shortest_path(g, 'A', 'E') == [2, 3, 5]
+    assert get_shortest_path(g, 'A', 'A') == []
+
+
+def test_create_adjacency_list_directed():
+    # directed graphs only consider outgoing edges
+    g = ig.Graph(directed=True)
+    g.add_vertices(3)
+    g.add_edges([(0, 1), (1, 2), (2, 0)], attributes={'length_m': [1., 2., 3.]})
+
+    assert create_adjacency_list(g, 0) == [[(1, 0, 1.)], [(2, 1, 2.)], [(0, 2, 3.)]]
+    assert get_shortest_path(g, 0, 2) == [0, 1]
+    assert get_shortest_path(g, 2, 1) == [2, 0]
@@ -13,3 +13,52 @@ def test_agent():
     assert agent.route_key == 'A-B'
     assert type(agent.route_data) == ig.Graph
     assert agent.route_data.is_directed()
+    assert not agent.visited_hubs
+
+    agent.add_first_route_data_entry()
+    assert agent.visited_hubs == {'A'}
+    assert agent.route_data.vs['name'] == ['A']
+
+
+def test_agent_clone():
+    agent = Agent('A', 'B', 'A-B', current_time=8., max_time=16.)
+    agent.add_first_route_data_entry()
+    agent.route_data.add_vertex(name='B', agents={})
+    agent.route_data.add_edge('A', 'B', key='A-B', agents={agent.uid: {'leg_times': [1.]}})
+    agent.visited_hubs.add('B')
+    agent.hubs_since_last_possible_resting_place.append('B')
+    agent.state.time_for_legs = [1.]
+
+    clone = agent.clone()
+    assert clone is not agent
+    assert clone.uid == agent.uid
+    assert clone.this_hub == 'A'
+    assert clone.next_hub == 'B'
+    assert clone.current_time == 8.
+    assert clone.max_time == 16.
+    assert clone.route_data.vs['name'] == ['A', 'B']
+    assert clone.route_data.es['key'] == ['A-B']
+    assert clone.state.time_for_legs == [1.]
+
+    # mutable parts must not be shared
+    clone.route_data.vs[1]['agents']['x'] = {}
+    clone.route_data.es[0]['agents']['x'] = {}
+    clone.route_data.add_vertex(name='C', agents={})
+    clone.visited_hubs.add('C')
+    clone.hubs_since_last_possible_resting_place.append('C')
+    clone.state.time_for_legs.append(2.)
+    assert 'x' not in agent.route_data.vs[1]['agents']
+    assert 'x' not in agent.route_data.es[0]['agents']
+    assert agent.route_data.vs['name'] == ['A', 'B']
+    assert agent.visited_hubs == {'A', 'B'}
+    assert agent.hubs_since_last_possible_resting_place == ['B']
+    assert agent.state.time_for_legs == [1.]
+
+
+def test_agent_hash():
+    agent = Agent('A', 'B', 'A-B', current_time=8.)
+    other = Agent('A', 'B', 'A-B', current_time=8.)
+    assert agent.hash() == other.hash()
+
+    other.current_time = 9.
+    assert agent.hash() != other.hash()
@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: 2022-present Maximilian Kalus <info@auxnet.de>
+#
+# SPDX-License-Identifier: MIT
+
+import igraph as ig
+import pytest
+
+from sitt.base import Context
+
+
+def test_context_lookups():
+    context = Context()
+    assert context.get_path_by_id('A-B') is None
+    assert context.get_hub_by_id('A') is None
+    assert context.get_graph_hub_by_id('A') is None
+    assert context.get_graph_path_by_id('A-B') is None
+
+    context.graph = ig.Graph()
+    context.graph.add_vertices(['A', 'B', 'C'], attributes={'overnight': ['y', 'n', 'y']})
+    context.graph.add_edges([(0, 1), (1, 2)], attributes={'name': ['A-B', 'B-C']})
+    context.routes = ig.Graph(directed=True)
+    context.routes.add_vertices(['A', 'B'])
+    context.routes.add_edges([(0, 1)], attributes={'name': ['A-B']})
+
+    assert context.get_path_by_id('A-B').index == 0
+    assert context.get_hub_by_id('B')['name'] == 'B'
+    assert context.get_graph_hub_by_id('C')['overnight'] == 'y'
+    assert context.get_graph_path_by_id('B-C').index == 1
+    with pytest.raises(ValueError):
+        context.get_path_by_id('B-A')
+    with pytest.raises(ValueError):
+        context.get_hub_by_id('C')
+
+    # replaced graphs are mapped again
+    context.routes = ig.Graph(directed=True)
+    context.routes.add_vertices(['B', 'A'])
+    context.routes.add_edges([(0, 1), (1, 0)], attributes={'name': ['B-A', 'A-B']})
+    assert context.get_path_by_id('A-B').index == 1
+    assert context.get_hub_by_id('A').index == 1
+
+    # vertices and edges added to the same graph are mapped, too
+    context.routes.add_vertices(['C'])
+    context.routes.add_edges([(1, 2)], attributes={'name': ['A-C']})
+    assert context.get_hub_by_id('C').index == 2
+    assert context.get_path_by_id('A-C').index == 2
+
+    # graphs without names raise the same error as find()
+    context.graph = ig.Graph()
+    context.graph.add_vertices(2)
+    context.graph.add_edges([(0, 1)])
+    with pytest.raises(ValueError):
+        context.get_graph_hub_by_id('A')
+    with pytest.raises(ValueError):
+        context.get_graph_path_by_id('A-B')
+
+
+def test_context_lookups_changed_in_place():
+    context = Context()
+    context.graph = ig.Graph()
+    context.graph.add_vertices(['A', 'B', 'C'])
+    context.graph.add_edges([(0, 1), (1, 2)], attributes={'name': ['A-B', 'B-C']})
+    assert context.get_graph_hub_by_id('B').index == 1
+    assert context.get_graph_path_by_id('B-C').index == 1
+
+    # rename in place - number of vertices and edges stays the same
+    context.graph.vs[1]['name'] = 'X'
+    context.graph.es[1]['name'] = 'X-C'
+    assert context.get_graph_hub_by_id('X').index == 1
+    assert context.get_graph_path_by_id('X-C').index == 1
+    with pytest.raises(ValueError):
+        context.get_graph_hub_by_id('B')
+    with pytest.raises(ValueError):
+        context.get_graph_path_by_id('B-C')
+
+    # delete one and add another - names have moved to other indexes
+    context.graph.delete_edges([0])
+    context.graph.add_edges([(2, 1)], attributes={'name': ['C-X']})
+    context.graph.delete_vertices([0])
+    context.graph.add_vertices(['D'])
+    assert context.get_graph_hub_by_id('C').index == 1
+    assert context.get_graph_hub_by_id('D').index == 2
+    assert context.get_graph_path_by_id('X-C').index == 0
+    assert context.get_graph_path_by_id('C-X').index == 1
@@ -24,4 +24,17 @@ def test_is_skipped():
     o.skip = True
     assert t.is_skipped(o, ctx)
 
-    # TODO: test module conditions
+    # test module conditions
+    o.skip = False
+    o.conditions = {'is_true': True, 'not_is_false': True}
+    assert not t.is_skipped(o, ctx)
+    o.conditions = {'is_true': False}
+    assert t.is_skipped(o, ctx)
+    o.conditions = {'not_is_true': True}
+    assert t.is_skipped(o, ctx)
+    o.conditions = {'file_must_exist': __file__}
+    assert not t.is_skipped(o, ctx)
+
+    # conditions changed in place are considered, too
+    o.conditions['is_false'] = True
+    assert t.is_skipped(o, ctx)
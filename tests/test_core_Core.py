@@ -0,0 +1,49 @@
+# SPDX-FileCopyrightText: 2022-present Maximilian Kalus <info@auxnet.de>
+#
+# SPDX-License-Identifier: MIT
+
+import igraph as ig
+
+from sitt import Configuration, Context, Core, OutputInterface, PreparationInterface, SetOfResults
+from sitt.modules.simulation_step import DummyForTests
+
+
+class PrepareGraphForTests(PreparationInterface):
+    """create a simple line of hubs START - A - B"""
+
+    def run(self, config: Configuration, context: Context) -> Context:
+        context.graph = ig.Graph()
+        context.graph.add_vertices(['START', 'A', 'B'], attributes={'overnight': ['y', 'y', 'y']})
+        context.routes = ig.Graph(directed=True)
+        context.routes.add_vertices(['START', 'A', 'B'])
+        context.routes.add_edges([('START', 'A'), ('A', 'B')], attributes={'name': ['START-A', 'A-B'],
+                                                                             'from': ['START', 'A']})
+        return context
+
+
+class FinishedAgentsForTests(OutputInterface):
+    """return day and time of finished agents"""
+
+    def run(self, config: Configuration, context: Context, set_of_results: SetOfResults) -> any:
+        return [(agent.day_finished, agent.current_time) for agent in set_of_results.agents_finished]
+
+
+def _create_config(simulation_end: str) -> Configuration:
+    config: Configuration = Configuration()
+    config.simulation_start = 'START'
+    config.simulation_end = simulation_end
+    config.preparation.append(PrepareGraphForTests())
+    config.simulation_step.append(DummyForTests(3.))
+    config.output.append(FinishedAgentsForTests())
+    return config
+
+
+def test_run():
+    assert Core(_create_config('A')).run() == [[(1, 11.)]]
+
+
+def test_run_ensemble():
+    configs = [_create_config('A'), _create_config('B')]
+
+    assert Core.run_ensemble(configs, max_workers=2) == [Core(config).run() for config in configs]
+    assert Core.run_ensemble(configs, max_workers=2) == [[[(1, 11.)]], [[(1, 14.)]]]
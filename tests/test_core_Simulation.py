@@ -1,6 +1,8 @@
 # SPDX-FileCopyrightText: 2022-present Maximilian Kalus <info@auxnet.de>
 #
 # SPDX-License-Identifier: MIT
+import multiprocessing as mp
+
 import igraph as ig
 
 from sitt import Agent, Configuration, Context, SetOfResults, Simulation
@@ -44,6 +46,11 @@ def test_create_agents_on_node():
     assert len(sim.create_agents_on_node('N1')) == 1
     assert len(sim.create_agents_on_node('STOP')) == 0
 
+    # outgoing routes are cached per hub
+    assert sim.get_outgoing_routes('START') == [('N1', 'START-N1'), ('N2', 'START-N2'), ('N2', 'START-N2')]
+    assert sim.outgoing_routes['N1'] == [('STOP', 'N1-STOP')]
+    assert sim.outgoing_routes['STOP'] == []
+
     # test cloning of existing agents
     agent = Agent('START', '', '', current_time=8., max_time=16.)
     agents = sim.create_agents_on_node('START')
@@ -56,8 +63,33 @@ def test_create_agents_on_node():
 
 
 def test_prune_agent_list():
-    # TODO: implement!
-    pass
+    sim = Simulation(Configuration(), Context())
+
+    # three agents arriving at C (two of them on the same route), and one on another route
+    agents: list[Agent] = []
+    for route in (['A', 'B', 'C'], ['A', 'X', 'C'], ['A', 'B', 'Y'], ['A', 'B', 'C']):
+        agent = Agent(route[0], '', '', current_time=8., max_time=16.)
+        agent.add_first_route_data_entry()
+        for i in range(1, len(route)):
+            agent.visited_hubs.add(route[i])
+            agent.route_data.add_vertex(name=route[i], agents={})
+            agent.route_data.add_edge(route[i - 1], route[i], key=route[i - 1] + '-' + route[i],
+                                      agents={agent.uid: {}})
+        agent.this_hub = route[-1]
+        agent.next_hub = 'D'
+        agent.route_key = route[-1] + '-D'
+        agents.append(agent)
+
+    pruned = sim._prune_agent_list(agents)
+
+    assert pruned == [agents[0], agents[2]]
+    assert agents[0].visited_hubs == {'A', 'B', 'C', 'X'}
+    assert sorted(agents[0].route_data.vs['name']) == ['A', 'B', 'C', 'X']
+    assert sorted(agents[0].route_data.es['key']) == ['A-B', 'A-X', 'B-C', 'X-C']
+    # data of shared routes is merged
+    assert set(agents[0].route_data.es.find(key='A-B')['agents']) == {agents[0].uid, agents[3].uid}
+    assert set(agents[0].route_data.es.find(key='X-C')['agents']) == {agents[1].uid}
+    assert agents[2].visited_hubs == {'A', 'B', 'Y'}
 
 
 def _create_simulation_for_test_runs(time_taken_per_node: float = 8., force_stop_at_node: None | str = None) -> tuple[
@@ -286,9 +318,161 @@ def test_run_single_step_forced_stop2():
     assert agent.state.time_taken == 0.0
 
 
+def test_run_single_step_time_exceeded():
+    # agent starting after maximum time should end day - state and step modules are still run as for any other step
+    sim = _create_simulation_for_full_runs()
+    results: SetOfResults = SetOfResults()
+    agents_proceed: list[Agent] = []
+    agents_finished_for_today: list[Agent] = []
+    agent = Agent('STAY', 'STOP', 'STAY-STOP', current_time=16.5, max_time=16.)
+    agent.add_first_route_data_entry()  # init correct data
+
+    assert sim._run_single_step(agent, results, agents_proceed, agents_finished_for_today) is None
+
+    assert not len(agents_proceed)
+    assert agents_finished_for_today == [agent]
+    assert agent.tries == 1
+    assert agent.current_time == 16.5
+    assert agent.state.time_for_legs == [3.]
+
+
+def _create_simulation_for_full_runs(simulation_workers: int = 1) -> Simulation:
+    config: Configuration = Configuration()
+    config.simulation_start = 'START'
+    config.simulation_end = 'STOP'
+    config.simulation_workers = simulation_workers
+    config.simulation_min_agents_per_worker = 1  # few agents only, run them in the pool anyway
+    config.simulation_step.append(DummyForTests(3.))
+    context: Context = Context()
+    context.graph = ig.Graph()
+    context.graph.add_vertices(['START', 'PASS', 'STAY', 'STAY2', 'STOP'],
+                               attributes={'overnight': ['y', 'n', 'y', 'y', 'y']})
+    context.routes = ig.Graph(directed=True)
+    context.routes.add_vertices(['START', 'PASS', 'STAY', 'STAY2', 'STOP'])
+    context.routes.add_edges([('START', 'PASS'), ('START', 'STAY'), ('START', 'STAY2'), ('PASS', 'STAY'),
+                              ('PASS', 'STAY2'), ('STAY', 'STOP'), ('STAY2', 'STOP')])
+    context.routes.es['name'] = ['START-PASS', 'START-STAY', 'START-STAY2', 'PASS-STAY', 'PASS-STAY2', 'STAY-STOP',
+                                 'STAY2-STOP']
+    context.routes.es['from'] = [e.source_vertex['name'] for e in context.routes.es]
+
+    return Simulation(config, context)
+
+
+def test_run():
+    results = _create_simulation_for_full_runs().run()
+
+    # routes via PASS take too long for a single day, so agents stay at an overnight hub on the way
+    assert len(results.agents_finished) == 4
+    assert not len(results.agents_cancelled)
+    assert [agent.day_finished for agent in results.agents_finished] == [1, 1, 2, 2]
+    for agent in results.agents_finished:
+        assert agent.this_hub == 'STOP'
+        # stay over at the end lasts until the latest time of the latest day (not the latest time of all days)
+        assert agent.route_data.vs[-1]['agents'][agent.uid]['end'] == {'day': 2, 'time': 11}
+
+
+def test_run_parallel():
+    sim = _create_simulation_for_full_runs(simulation_workers=2)
+    results = sim.run()
+    expected = _create_simulation_for_full_runs().run()
+
+    assert sim.pool is None
+    assert len(results.agents_finished) == len(expected.agents_finished)
+    assert len(results.agents_cancelled) == len(expected.agents_cancelled)
+    assert [agent.current_time for agent in results.agents_finished] == \
+           [agent.current_time for agent in expected.agents_finished]
+    # uids drawn in different processes must not collide
+    assert len({agent.uid for agent in results.agents_finished}) == len(results.agents_finished)
+
+
+class UnpicklablePreparationForTests:
+    """Preparation module holding an object that cannot be pickled (like a database connection)"""
+
+    def __init__(self):
+        self.conn = lambda: None
+
+
+def test_run_steps_in_spawned_pool():
+    sim = _create_simulation_for_full_runs(simulation_workers=2)
+    sim.config.preparation.append(UnpicklablePreparationForTests())
+    agents = sim.create_agents_on_node('START', first_day=True)
+    results: SetOfResults = SetOfResults()
+    agents_proceed: list[Agent] = []
+    agents_finished_for_today: list[Agent] = []
+
+    # workers started with spawn get config and context pickled - preparation modules must not be sent along
+    sim._start_pool(mp.get_context('spawn'))
+    try:
+        sim._run_steps_in_pool(agents, results, agents_proceed, agents_finished_for_today)
+    finally:
+        sim._stop_pool()
+
+    # same agents as running steps in the main process
+    expected_proceed: list[Agent] = []
+    for agent in sim.create_agents_on_node('START', first_day=True):
+        sim._run_single_step(agent, SetOfResults(), expected_proceed, [])
+    assert [(agent.this_hub, agent.next_hub) for agent in agents_proceed] == \
+           [(agent.this_hub, agent.next_hub) for agent in expected_proceed]
+    assert len(sim.config.preparation) == 1
+
+
+def test_run_parallel_few_agents(monkeypatch):
+    sim = _create_simulation_for_full_runs(simulation_workers=2)
+    sim.config.simulation_min_agents_per_worker = 20
+
+    # too few agents for the workers, so all steps are run in the main process
+    def fail(*args):
+        raise AssertionError('steps should not run in pool')
+    monkeypatch.setattr(sim, '_run_steps_in_pool', fail)
+
+    results = sim.run()
+    assert len(results.agents_finished) == 4
+
+
+def test_is_overnight_stay():
+    sim = _create_simulation_for_full_runs()
+    assert sim.is_overnight_stay('START')
+    assert not sim.is_overnight_stay('PASS')
+    assert sim.overnight_stays == {'START': True, 'PASS': False}
+
+    # hubs with an overnight hub are overnight stays, too
+    sim = _create_simulation_for_full_runs()
+    sim.context.graph.vs['overnight_hub'] = [None, 'STAY', None, None, None]
+    assert sim.is_overnight_stay('PASS')
+
+
 def test_end_day():
-    # TODO: implement!
-    pass
+    sim = _create_simulation_for_full_runs()
+    results: SetOfResults = SetOfResults()
+    agents_finished_for_today: list[Agent] = []
+
+    # agent has rested at START and passed PASS (no overnight stay possible)
+    agent = Agent('START', 'PASS', 'START-PASS', current_time=8., max_time=16.)
+    agent.add_first_route_data_entry()
+    agent.visited_hubs.add('PASS')
+    agent.route_data.add_vertex(name='PASS', agents={})
+    agent.route_data.add_edge('START', 'PASS', key='START-PASS', agents={agent.uid: {}})
+    agent.hubs_since_last_possible_resting_place.append('PASS')
+    agent.this_hub = 'PASS'
+    agent.next_hub = 'STAY'
+    agent.route_key = 'PASS-STAY'
+
+    sim._end_day(agent, results, agents_finished_for_today)
+
+    # traceback to START: hubs passed are removed in bulk, agents are created on START again
+    assert agent.tries == 0  # reset, because resting place changed
+    assert agent.last_resting_place == 'PASS'
+    assert agent.visited_hubs == {'START'}
+    assert agent.route_data.vs['name'] == ['START']
+    assert not agent.hubs_since_last_possible_resting_place
+    assert [(a.this_hub, a.next_hub) for a in agents_finished_for_today] == \
+           [('START', 'PASS'), ('START', 'STAY'), ('START', 'STAY2')]
+    assert not len(results.agents_cancelled)
+
+    # exceeding tries will cancel agent
+    sim.config.break_simulation_after = 0
+    sim._end_day(agent, results, agents_finished_for_today)
+    assert results.agents_cancelled == [agent]
 
 
 def test_output():